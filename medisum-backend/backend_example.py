@@ -8,6 +8,8 @@ import base64
 import io
 import re
 
+from dataset_store import DatasetStore, ensure_store, DEFAULT_PAGE_SIZE
+
 # Try to import PyPDF2 for real PDF processing
 try:
     import PyPDF2
@@ -24,6 +26,9 @@ tokenizer = None
 model = None
 summarizer = None
 
+# Global dataset store (indexed copy of test.json-style corpora)
+dataset = None
+
 def load_model():
     """Load the medical LLM model"""
     global tokenizer, model, summarizer
@@ -85,6 +90,40 @@ def load_model():
         print("Make sure you have a compatible model in the expected directory")
         return False
 
+def load_dataset():
+    """Index the Q&A corpus once and open it for paginated access"""
+    global dataset
+
+    dataset_paths = [
+        os.environ.get("MEDISUM_DATASET", ""),
+        "./test.json",
+        "./medisum-backend/test.json"
+    ]
+
+    source_path = None
+    for path in dataset_paths:
+        if path and os.path.isfile(path):
+            source_path = path
+            break
+
+    if not source_path:
+        print("⚠️  No dataset found, /dataset endpoints will be unavailable")
+        return False
+
+    try:
+        # Index next to the source unless it lives on a read-only or shared mount
+        store_dir = os.environ.get("MEDISUM_DATASET_STORE") or os.path.splitext(source_path)[0] + ".dataset"
+        if ensure_store(source_path, store_dir):
+            print(f"📦 Indexed dataset {source_path} into {store_dir}")
+
+        dataset = DatasetStore(store_dir)
+        print(f"✅ Dataset loaded: {len(dataset)} records")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error loading dataset: {e}")
+        return False
+
 def extract_text_from_pdf(pdf_content):
     """Extract text from PDF content using PyPDF2 or fallback to simulation"""
     try:
@@ -334,9 +373,55 @@ def get_model_info():
     except Exception as e:
         return jsonify({"error": f"Failed to get model info: {str(e)}"}), 500
 
+@app.route('/dataset/stats', methods=['GET'])
+def get_dataset_stats():
+    """Get precomputed corpus aggregates"""
+    if dataset is None:
+        return jsonify({"error": "Dataset not loaded"}), 500
+
+    try:
+        stats = dataset.stats()
+        stats["labels"] = dataset.labels()
+        return jsonify(stats)
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to get dataset stats: {str(e)}"}), 500
+
+@app.route('/dataset/records', methods=['GET'])
+def get_dataset_records():
+    """Get a page of dataset records, optionally filtered by label or question text"""
+    if dataset is None:
+        return jsonify({"error": "Dataset not loaded"}), 500
+
+    try:
+        offset = request.args.get('offset', 0, type=int)
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        label = request.args.get('label') or None
+        query = request.args.get('q') or None
+
+        return jsonify(dataset.page(offset=offset, limit=limit, label=label, query=query))
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to get dataset records: {str(e)}"}), 500
+
+@app.route('/dataset/records/<int:record_id>', methods=['GET'])
+def get_dataset_record(record_id):
+    """Get a single dataset record"""
+    if dataset is None:
+        return jsonify({"error": "Dataset not loaded"}), 500
+
+    try:
+        return jsonify({"id": record_id, "record": dataset.get(record_id)})
+
+    except IndexError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": f"Failed to get dataset record: {str(e)}"}), 500
+
 if __name__ == '__main__':
     # Load model on startup
     model_loaded = load_model()
+    load_dataset()
     
     print("🚀 Starting Medical LLM API server...")
     print("📖 API Documentation:")
@@ -345,6 +430,8 @@ if __name__ == '__main__':
     print("   - POST /validate - Validate medical content")
     print("   - GET  /status   - Get model status")
     print("   - GET  /model-info - Get detailed model information")
+    print("   - GET  /dataset/stats - Get dataset aggregates")
+    print("   - GET  /dataset/records - Browse dataset records (offset, limit, label, q)")
     print("   - GET  /         - Health check")
     print("\n🌐 Server will start on http://localhost:8000")
     
@@ -0,0 +1,497 @@
+"""
+Indexed, paginated access to test.json-style medical Q&A corpora.
+
+A corpus (a JSON array of records such as ``test.json``, or a JSONL file)
+is converted once into a directory with the following layout:
+
+    records.jsonl        one compact JSON record per line
+    records.idx          little-endian uint64 byte offsets, record i spans
+                         offsets[i]:offsets[i + 1]
+    label-<LABEL>.ids    little-endian uint32 ids of records that have at
+                         least one answer span with that label (the label
+                         is percent-encoded to be a safe filename)
+    stats.json           corpus aggregates and the source fingerprint
+
+Reads go through mmap, so serving a page only touches the bytes of the
+records on that page and response time does not depend on corpus size.
+Aggregates are updated record by record as data is appended, so they never
+require a second pass over the corpus.
+"""
+
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+from urllib.parse import quote, unquote
+
+RECORDS_FILE = "records.jsonl"
+INDEX_FILE = "records.idx"
+STATS_FILE = "stats.json"
+LABEL_FILE_PREFIX = "label-"
+LABEL_FILE_SUFFIX = ".ids"
+
+OFFSET_TYPE = "Q"
+OFFSET_FORMAT = "<" + OFFSET_TYPE
+OFFSET_SIZE = struct.calcsize(OFFSET_FORMAT)
+RECORD_ID_TYPE = "I"
+RECORD_ID_FORMAT = "<" + RECORD_ID_TYPE
+RECORD_ID_SIZE = struct.calcsize(RECORD_ID_FORMAT)
+
+# Upper bounds (in characters) of the answer-length histogram buckets
+ANSWER_LENGTH_BUCKETS = [100, 250, 500, 1000, 2000, 5000]
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+# Records examined per request when filtering by free text
+MAX_SCAN_PER_REQUEST = 5000
+
+READ_CHUNK_SIZE = 1 << 20
+# Largest single record the array parser will buffer, in chunks
+MAX_RECORD_CHUNKS = 64
+
+# A number, literal or escape sequence cut off at the end of the buffer
+_PARTIAL_TOKEN = re.compile(r"[\w.+\-\\]*")
+
+
+def iter_source_records(source_path):
+    """Stream records from a JSON array or JSONL file without loading it whole"""
+    decoder = json.JSONDecoder()
+
+    # utf-8-sig drops a leading BOM, which would otherwise hide the "["
+    with open(source_path, "r", encoding="utf-8-sig") as f:
+        buffer = f.read(READ_CHUNK_SIZE)
+        pos = _skip_whitespace(buffer, 0)
+
+        # JSONL input: one record per line
+        if buffer[pos:pos + 1] != "[":
+            f.seek(0)
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+
+        pos += 1
+        eof = False
+        while True:
+            pos = _skip_whitespace(buffer, pos)
+            if pos < len(buffer) and buffer[pos] == ",":
+                pos = _skip_whitespace(buffer, pos + 1)
+
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+
+            try:
+                if pos >= len(buffer):
+                    raise json.JSONDecodeError("Need more data", buffer, pos)
+                record, end = decoder.raw_decode(buffer, pos)
+                # A value ending exactly at the buffer edge (e.g. a number) may
+                # continue in the next chunk
+                if end == len(buffer) and not eof:
+                    raise json.JSONDecodeError("Need more data", buffer, end)
+            except json.JSONDecodeError as e:
+                if eof or not _needs_more_data(buffer, e):
+                    raise ValueError(f"Truncated or malformed JSON array in {source_path}: {e}")
+                pending = len(buffer) - pos
+                if pending >= MAX_RECORD_CHUNKS * READ_CHUNK_SIZE:
+                    raise ValueError(f"Record larger than {pending} characters in {source_path}")
+                # Drop what has been consumed and read the rest of the record,
+                # growing the read with the record so re-parsing stays linear
+                chunk = f.read(max(READ_CHUNK_SIZE, pending))
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            yield record
+            pos = end
+
+
+def _needs_more_data(buffer, error):
+    """Whether a decode error is a value cut off at the end of the buffer"""
+    if error.pos >= len(buffer) or error.msg.startswith("Unterminated string"):
+        return True
+    return _PARTIAL_TOKEN.fullmatch(buffer, error.pos) is not None
+
+
+def _skip_whitespace(text, pos):
+    while pos < len(text) and text[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+def _answer_length_bucket(length):
+    for i, upper in enumerate(ANSWER_LENGTH_BUCKETS):
+        if length < upper:
+            return i
+    return len(ANSWER_LENGTH_BUCKETS)
+
+
+def _answer_length_labels():
+    labels = []
+    lower = 0
+    for upper in ANSWER_LENGTH_BUCKETS:
+        labels.append(f"{lower}-{upper - 1}")
+        lower = upper
+    labels.append(f"{lower}+")
+    return labels
+
+
+def record_labels(record):
+    """Return the sorted span labels present in a record"""
+    spans = record.get("labelled_answer_spans") or {}
+    return sorted(label for label, items in spans.items() if items)
+
+
+class CorpusStats:
+    """Running corpus aggregates, updated one record at a time"""
+
+    def __init__(self):
+        self.record_count = 0
+        self.answer_count = 0
+        self.answer_chars = 0
+        self.min_answer_length = None
+        self.max_answer_length = None
+        self.answer_length_histogram = [0] * (len(ANSWER_LENGTH_BUCKETS) + 1)
+        self.answers_per_record = {}
+        self.label_span_counts = {}
+        self.label_record_counts = {}
+        self.summary_counts = {}
+        self.source = None
+
+    def add(self, record):
+        """Fold a single record into the aggregates"""
+        self.record_count += 1
+
+        answers = record.get("answers") or []
+        key = str(len(answers))
+        self.answers_per_record[key] = self.answers_per_record.get(key, 0) + 1
+
+        for answer in answers:
+            length = len(answer)
+            self.answer_count += 1
+            self.answer_chars += length
+            self.answer_length_histogram[_answer_length_bucket(length)] += 1
+            if self.min_answer_length is None or length < self.min_answer_length:
+                self.min_answer_length = length
+            if self.max_answer_length is None or length > self.max_answer_length:
+                self.max_answer_length = length
+
+        spans = record.get("labelled_answer_spans") or {}
+        for label, items in spans.items():
+            if not items:
+                continue
+            self.label_span_counts[label] = self.label_span_counts.get(label, 0) + len(items)
+            self.label_record_counts[label] = self.label_record_counts.get(label, 0) + 1
+
+        summaries = record.get("labelled_summaries") or {}
+        for label, summary in summaries.items():
+            if summary:
+                self.summary_counts[label] = self.summary_counts.get(label, 0) + 1
+
+    def to_dict(self):
+        return {
+            "record_count": self.record_count,
+            "answer_count": self.answer_count,
+            "answer_chars": self.answer_chars,
+            "avg_answer_length": self.answer_chars / self.answer_count if self.answer_count else 0,
+            "min_answer_length": self.min_answer_length,
+            "max_answer_length": self.max_answer_length,
+            "answer_length_histogram": dict(zip(_answer_length_labels(), self.answer_length_histogram)),
+            "answers_per_record": self.answers_per_record,
+            "label_span_counts": self.label_span_counts,
+            "label_record_counts": self.label_record_counts,
+            "summary_counts": self.summary_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.record_count = data.get("record_count", 0)
+        stats.answer_count = data.get("answer_count", 0)
+        stats.answer_chars = data.get("answer_chars", 0)
+        stats.min_answer_length = data.get("min_answer_length")
+        stats.max_answer_length = data.get("max_answer_length")
+        histogram = data.get("answer_length_histogram") or {}
+        stats.answer_length_histogram = [histogram.get(label, 0) for label in _answer_length_labels()]
+        stats.answers_per_record = dict(data.get("answers_per_record") or {})
+        stats.label_span_counts = dict(data.get("label_span_counts") or {})
+        stats.label_record_counts = dict(data.get("label_record_counts") or {})
+        stats.summary_counts = dict(data.get("summary_counts") or {})
+        stats.source = data.get("source")
+        return stats
+
+
+def _load_stats(store_dir):
+    stats_path = os.path.join(store_dir, STATS_FILE)
+    if not os.path.exists(stats_path):
+        return CorpusStats()
+    with open(stats_path, "r", encoding="utf-8") as f:
+        return CorpusStats.from_dict(json.load(f))
+
+
+def _save_stats(store_dir, stats):
+    # Write-then-rename so readers never see a half-written file
+    stats_path = os.path.join(store_dir, STATS_FILE)
+    tmp_path = stats_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        # The source fingerprint is only for ensure_store, not part of to_dict()
+        json.dump(dict(stats.to_dict(), source=stats.source), f, indent=2)
+    os.replace(tmp_path, stats_path)
+
+
+def _label_path(store_dir, label):
+    # Labels come from the data, so encode anything that is not filename-safe
+    return os.path.join(store_dir, f"{LABEL_FILE_PREFIX}{quote(label, safe='')}{LABEL_FILE_SUFFIX}")
+
+
+def append_records(store_dir, records):
+    """Append records to a store, updating the index, label lists and stats"""
+    os.makedirs(store_dir, exist_ok=True)
+    records_path = os.path.join(store_dir, RECORDS_FILE)
+    index_path = os.path.join(store_dir, INDEX_FILE)
+
+    stats = _load_stats(store_dir)
+    label_files = {}
+    appended = 0
+
+    # Index always starts with the offset of record 0
+    if not os.path.exists(index_path) or os.path.getsize(index_path) == 0:
+        with open(index_path, "wb") as f:
+            f.write(struct.pack(OFFSET_FORMAT, 0))
+
+    try:
+        with open(records_path, "ab") as records_file, open(index_path, "ab") as index_file:
+            offset = records_file.tell()
+            record_id = os.path.getsize(index_path) // OFFSET_SIZE - 1
+
+            for record in records:
+                # Validate before writing so a bad record leaves the store consistent
+                if not isinstance(record, dict):
+                    raise ValueError(f"Record {appended} is not a JSON object (got {type(record).__name__})")
+
+                line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                records_file.write(line)
+                offset += len(line)
+                index_file.write(struct.pack(OFFSET_FORMAT, offset))
+
+                for label in record_labels(record):
+                    if label not in label_files:
+                        label_files[label] = open(_label_path(store_dir, label), "ab")
+                    label_files[label].write(struct.pack(RECORD_ID_FORMAT, record_id))
+
+                stats.add(record)
+                record_id += 1
+                appended += 1
+    finally:
+        for label_file in label_files.values():
+            label_file.close()
+        # Keep the aggregates in step with whatever was written
+        _save_stats(store_dir, stats)
+
+    return appended
+
+
+def _source_fingerprint(source_path):
+    st = os.stat(source_path)
+    return {"path": os.path.abspath(source_path), "size": st.st_size, "mtime": st.st_mtime}
+
+
+def build_store(source_path, store_dir):
+    """Convert a JSON/JSONL corpus into an indexed store directory"""
+    tmp_dir = store_dir.rstrip(os.sep) + ".building"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+
+    try:
+        count = append_records(tmp_dir, iter_source_records(source_path))
+
+        stats = _load_stats(tmp_dir)
+        stats.source = _source_fingerprint(source_path)
+        _save_stats(tmp_dir, stats)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    if os.path.exists(store_dir):
+        shutil.rmtree(store_dir)
+    os.rename(tmp_dir, store_dir)
+    return count
+
+
+def ensure_store(source_path, store_dir):
+    """Build the store if it is missing or older than its source; return True if rebuilt"""
+    stats_path = os.path.join(store_dir, STATS_FILE)
+    if os.path.exists(stats_path):
+        source = _load_stats(store_dir).source or {}
+        current = _source_fingerprint(source_path)
+        if source.get("size") == current["size"] and source.get("mtime") == current["mtime"]:
+            return False
+
+    build_store(source_path, store_dir)
+    return True
+
+
+class _MappedFile:
+    """Read-only mmap of a file that may grow through append_records"""
+
+    def __init__(self, path):
+        self.path = path
+        self.size = 0
+        self._file = None
+        self._map = None
+        self.refresh()
+
+    def refresh(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size == self.size and (self._map is not None or size == 0):
+            return
+        self.close()
+        self.size = size
+        # mmap cannot map empty files
+        if size:
+            self._file = open(self.path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+
+    def read(self, start, end):
+        return self._map[start:end]
+
+    def unpack(self, type_code, item_size, index, count=1):
+        return struct.unpack_from(f"<{count}{type_code}", self._map, index * item_size)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.size = 0
+
+
+class DatasetStore:
+    """Paginated, filterable, mmap-backed reader over a store directory"""
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self._records = _MappedFile(os.path.join(store_dir, RECORDS_FILE))
+        self._index = _MappedFile(os.path.join(store_dir, INDEX_FILE))
+        self._labels = {}
+
+    def refresh(self):
+        """Pick up records appended since the store was opened"""
+        self._index.refresh()
+        self._records.refresh()
+        for mapped in self._labels.values():
+            mapped.refresh()
+
+    def __len__(self):
+        return max(self._index.size // OFFSET_SIZE - 1, 0)
+
+    def labels(self):
+        names = []
+        for name in os.listdir(self.store_dir):
+            if name.startswith(LABEL_FILE_PREFIX) and name.endswith(LABEL_FILE_SUFFIX):
+                names.append(unquote(name[len(LABEL_FILE_PREFIX):-len(LABEL_FILE_SUFFIX)]))
+        return sorted(names)
+
+    def stats(self):
+        return _load_stats(self.store_dir).to_dict()
+
+    def get(self, record_id):
+        """Return a single record by its position in the corpus"""
+        if record_id < 0 or record_id >= len(self):
+            raise IndexError(f"Record {record_id} out of range")
+        start, end = self._index.unpack(OFFSET_TYPE, OFFSET_SIZE, record_id, 2)
+        # The index can be ahead of the records map if a writer is mid-append
+        if end > self._records.size:
+            self._records.refresh()
+        return json.loads(self._records.read(start, end))
+
+    def _label_ids(self, label):
+        if label not in self._labels:
+            # Only open files for labels the store actually has
+            if label not in self.labels():
+                return None
+            self._labels[label] = _MappedFile(_label_path(self.store_dir, label))
+        return self._labels[label]
+
+    def page(self, offset=0, limit=DEFAULT_PAGE_SIZE, label=None, query=None):
+        """
+        Return a page of records.
+
+        ``offset`` is a position in the candidate list: the whole corpus, or
+        the records carrying ``label``. ``query`` further keeps records whose
+        question contains it (case-insensitive); since that needs each
+        candidate to be decoded, at most MAX_SCAN_PER_REQUEST candidates are
+        examined per call and ``next_offset`` tells the caller where to resume.
+        """
+        self.refresh()
+        offset = max(int(offset), 0)
+        limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
+
+        if label:
+            label_ids = self._label_ids(label)
+            total = label_ids.size // RECORD_ID_SIZE if label_ids else 0
+        else:
+            label_ids = None
+            total = len(self)
+
+        def candidate_ids(start, count):
+            count = min(count, total - start)
+            if count <= 0:
+                return ()
+            if label_ids is None:
+                return range(start, start + count)
+            return label_ids.unpack(RECORD_ID_TYPE, RECORD_ID_SIZE, start, count)
+
+        items = []
+        position = offset
+
+        if not query:
+            for record_id in candidate_ids(offset, limit):
+                items.append({"id": record_id, "record": self.get(record_id)})
+            position = min(offset + limit, total)
+        else:
+            needle = query.lower()
+            scan_end = min(offset + MAX_SCAN_PER_REQUEST, total)
+            while position < scan_end and len(items) < limit:
+                batch = candidate_ids(position, min(limit, scan_end - position))
+                for record_id in batch:
+                    position += 1
+                    record = self.get(record_id)
+                    if needle in (record.get("question") or "").lower():
+                        items.append({"id": record_id, "record": record})
+                        if len(items) >= limit:
+                            break
+
+        return {
+            "offset": offset,
+            "limit": limit,
+            "total": total,
+            "next_offset": position if position < total else None,
+            "label": label,
+            "query": query,
+            "records": items,
+        }
+
+    def close(self):
+        self._records.close()
+        self._index.close()
+        for mapped in self._labels.values():
+            mapped.close()
+        self._labels = {}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python dataset_store.py <source.json|source.jsonl> <store_dir>")
+        sys.exit(1)
+
+    source, target = sys.argv[1], sys.argv[2]
+    print(f"📦 Converting {source} -> {target}")
+    converted = build_store(source, target)
+    print(f"✅ Indexed {converted} records")
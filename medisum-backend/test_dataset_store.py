@@ -0,0 +1,232 @@
+import json
+
+import pytest
+
+import dataset_store
+from dataset_store import DatasetStore, build_store, ensure_store, iter_source_records
+
+
+def make_record(i, question, labels):
+    return {
+        "uri": str(i),
+        "question": question,
+        "context": "",
+        "answers": ["a" * (50 * (i + 1))],
+        "labelled_answer_spans": {label: [{"txt": "span", "label_spans": [0, 4]}] for label in labels},
+        "labelled_summaries": {f"{label}_SUMMARY": "summary" for label in labels},
+        "raw_text": f"uri: {i}",
+    }
+
+
+RECORDS = [
+    make_record(0, "What causes diabetes?", ["CAUSE", "INFORMATION"]),
+    make_record(1, "Is fever dangerous?", ["SUGGESTION"]),
+    make_record(2, "Diabetes diet tips", ["SUGGESTION", "INFORMATION"]),
+    make_record(3, "Héadache after running", ["EXPERIENCE"]),
+    make_record(4, "diabetes and exercise", ["INFORMATION", "A/B"]),
+    make_record(5, "Cold or flu?", []),
+]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # A tiny chunk size forces every record across many read boundaries
+    monkeypatch.setattr(dataset_store, "READ_CHUNK_SIZE", 7)
+    monkeypatch.setattr(dataset_store, "MAX_RECORD_CHUNKS", 1000)
+    source = tmp_path / "corpus.json"
+    source.write_text(json.dumps(RECORDS, indent=2), encoding="utf-8")
+
+    store_dir = tmp_path / "corpus.dataset"
+    assert build_store(str(source), str(store_dir)) == len(RECORDS)
+
+    store = DatasetStore(str(store_dir))
+    yield store
+    store.close()
+
+
+def test_scalars_are_not_split_at_chunk_boundaries(tmp_path, monkeypatch):
+    source = tmp_path / "numbers.json"
+    source.write_text('[12345, 6, "abc", {"a": [1, 2]}, true, null]', encoding="utf-8")
+    for chunk_size in (1, 2, 3, 5):
+        monkeypatch.setattr(dataset_store, "READ_CHUNK_SIZE", chunk_size)
+        assert list(iter_source_records(str(source))) == [12345, 6, "abc", {"a": [1, 2]}, True, None]
+
+
+def test_truncated_array_raises(tmp_path):
+    source = tmp_path / "broken.json"
+    source.write_text('[{"a": 1}, {"b":', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_source_records(str(source)))
+
+
+class CountingFile:
+    """Wrap a text file and count how many characters have been read"""
+
+    def __init__(self, f, counter):
+        self._f = f
+        self._counter = counter
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        self._counter["chars"] += len(data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __iter__(self):
+        return iter(self._f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+
+@pytest.fixture
+def read_counter(monkeypatch):
+    counter = {"chars": 0}
+    monkeypatch.setattr(dataset_store, "open", lambda *a, **kw: CountingFile(open(*a, **kw), counter), raising=False)
+    return counter
+
+
+def test_malformed_record_fails_without_reading_to_eof(tmp_path, monkeypatch, read_counter):
+    monkeypatch.setattr(dataset_store, "READ_CHUNK_SIZE", 16)
+    source = tmp_path / "malformed.json"
+    text = '[{"a": 1,}, ' + ", ".join(json.dumps(r) for r in RECORDS * 50) + "]"
+    source.write_text(text, encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(iter_source_records(str(source)))
+    assert read_counter["chars"] < 100 < len(text)
+
+
+def test_oversized_record_is_rejected(tmp_path, monkeypatch, read_counter):
+    monkeypatch.setattr(dataset_store, "READ_CHUNK_SIZE", 16)
+    monkeypatch.setattr(dataset_store, "MAX_RECORD_CHUNKS", 4)
+    source = tmp_path / "huge.json"
+    text = json.dumps([{"answers": ["x" * 10000]}])
+    source.write_text(text, encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(iter_source_records(str(source)))
+    assert read_counter["chars"] < 200 < len(text)
+
+
+def test_non_object_record_is_rejected_and_cleaned_up(tmp_path):
+    source = tmp_path / "mixed.json"
+    source.write_text(json.dumps([RECORDS[0], 12345, RECORDS[1]]), encoding="utf-8")
+    store_dir = tmp_path / "mixed.dataset"
+
+    with pytest.raises(ValueError, match="Record 1 is not a JSON object"):
+        build_store(str(source), str(store_dir))
+    assert not store_dir.exists()
+    assert not (tmp_path / "mixed.dataset.building").exists()
+
+
+def test_byte_order_mark_is_ignored(tmp_path):
+    for name, text in (("bom.json", json.dumps(RECORDS)), ("bom.jsonl", "\n".join(json.dumps(r) for r in RECORDS))):
+        source = tmp_path / name
+        source.write_text(text, encoding="utf-8-sig")
+        assert list(iter_source_records(str(source))) == RECORDS
+
+
+def test_get_round_trips_every_record(store):
+    assert len(store) == len(RECORDS)
+    for i, record in enumerate(RECORDS):
+        assert store.get(i) == record
+
+    with pytest.raises(IndexError):
+        store.get(len(RECORDS))
+
+
+def test_label_filter(store):
+    assert store.labels() == ["A/B", "CAUSE", "EXPERIENCE", "INFORMATION", "SUGGESTION"]
+
+    page = store.page(label="INFORMATION")
+    assert page["total"] == 3
+    assert [item["id"] for item in page["records"]] == [0, 2, 4]
+    assert page["next_offset"] is None
+
+    page = store.page(offset=1, limit=1, label="INFORMATION")
+    assert [item["id"] for item in page["records"]] == [2]
+    assert page["next_offset"] == 2
+
+    page = store.page(label="A/B")
+    assert [item["id"] for item in page["records"]] == [4]
+
+
+def test_unknown_label_returns_empty_page(store):
+    for label in ("MISSING", "../corpus", "../../stats.json"):
+        page = store.page(label=label)
+        assert page["total"] == 0
+        assert page["records"] == []
+        assert page["next_offset"] is None
+
+
+def test_out_of_range_offset(store):
+    page = store.page(offset=100)
+    assert page["records"] == []
+    assert page["next_offset"] is None
+
+    page = store.page(offset=100, query="diabetes")
+    assert page["records"] == []
+    assert page["next_offset"] is None
+
+
+def test_query_resumes_from_next_offset(store, monkeypatch):
+    page = store.page(limit=2, query="DIABETES")
+    assert [item["id"] for item in page["records"]] == [0, 2]
+    assert page["next_offset"] == 3
+
+    page = store.page(offset=page["next_offset"], limit=2, query="diabetes")
+    assert [item["id"] for item in page["records"]] == [4]
+    assert page["next_offset"] is None
+
+    # A bounded scan window can end with no matches but a resumable offset
+    monkeypatch.setattr(dataset_store, "MAX_SCAN_PER_REQUEST", 2)
+    page = store.page(offset=3, query="diabetes")
+    assert [item["id"] for item in page["records"]] == [4]
+    assert page["next_offset"] == 5
+
+    page = store.page(offset=5, query="diabetes")
+    assert page["records"] == []
+    assert page["next_offset"] is None
+
+    page = store.page(limit=1, label="INFORMATION", query="diabetes")
+    assert [item["id"] for item in page["records"]] == [0]
+    assert page["next_offset"] == 1
+
+
+def test_stats(store):
+    stats = store.stats()
+    assert "source" not in stats
+    assert stats["record_count"] == len(RECORDS)
+    assert stats["answer_count"] == len(RECORDS)
+    assert stats["label_record_counts"]["INFORMATION"] == 3
+    assert stats["label_span_counts"]["SUGGESTION"] == 2
+    assert stats["summary_counts"]["CAUSE_SUMMARY"] == 1
+    assert sum(stats["answer_length_histogram"].values()) == len(RECORDS)
+
+
+def test_append_updates_index_and_stats(store):
+    dataset_store.append_records(store.store_dir, [make_record(6, "More diabetes", ["CAUSE"])])
+
+    page = store.page(offset=6)
+    assert [item["id"] for item in page["records"]] == [6]
+    assert store.page(label="CAUSE")["total"] == 2
+    assert store.stats()["record_count"] == len(RECORDS) + 1
+
+
+def test_ensure_store_rebuilds_only_when_source_changes(tmp_path):
+    source = tmp_path / "corpus.jsonl"
+    source.write_text("\n".join(json.dumps(r) for r in RECORDS[:2]) + "\n", encoding="utf-8")
+    store_dir = str(tmp_path / "corpus.dataset")
+
+    assert ensure_store(str(source), store_dir) is True
+    assert ensure_store(str(source), store_dir) is False
+
+    source.write_text("\n".join(json.dumps(r) for r in RECORDS) + "\n", encoding="utf-8")
+    assert ensure_store(str(source), store_dir) is True
+    assert len(DatasetStore(store_dir)) == len(RECORDS)
@@ -14,6 +14,48 @@ interface SummaryResponse {
   perspective: string;
 }
 
+interface DatasetRecord {
+  uri: string;
+  question: string;
+  context: string;
+  answers: string[];
+  labelled_answer_spans: Record<string, { txt: string; label_spans: number[] }[]>;
+  labelled_summaries: Record<string, string>;
+  raw_text: string;
+}
+
+interface DatasetPageRequest {
+  offset?: number;
+  limit?: number;
+  label?: string;
+  query?: string;
+}
+
+interface DatasetPage {
+  offset: number;
+  limit: number;
+  total: number;
+  next_offset: number | null;
+  label: string | null;
+  query: string | null;
+  records: { id: number; record: DatasetRecord }[];
+}
+
+interface DatasetStats {
+  record_count: number;
+  answer_count: number;
+  answer_chars: number;
+  avg_answer_length: number;
+  min_answer_length: number | null;
+  max_answer_length: number | null;
+  answer_length_histogram: Record<string, number>;
+  answers_per_record: Record<string, number>;
+  label_span_counts: Record<string, number>;
+  label_record_counts: Record<string, number>;
+  summary_counts: Record<string, number>;
+  labels: string[];
+}
+
 class LLMClient {
   private baseUrl: string;
 
@@ -93,6 +135,57 @@ class LLMClient {
     }
   }
 
+  async getDatasetStats(): Promise<DatasetStats> {
+    try {
+      const response = await fetch(`${this.baseUrl}/dataset/stats`);
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      return await response.json();
+    } catch (error) {
+      console.error('Error getting dataset stats:', error);
+      throw new Error(`Failed to get dataset stats: ${error instanceof Error ? error.message : 'Unknown error'}`);
+    }
+  }
+
+  async getDatasetRecords(request: DatasetPageRequest = {}): Promise<DatasetPage> {
+    try {
+      const params = new URLSearchParams();
+      if (request.offset !== undefined) params.set('offset', String(request.offset));
+      if (request.limit !== undefined) params.set('limit', String(request.limit));
+      if (request.label) params.set('label', request.label);
+      if (request.query) params.set('q', request.query);
+
+      const response = await fetch(`${this.baseUrl}/dataset/records?${params.toString()}`);
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      return await response.json();
+    } catch (error) {
+      console.error('Error getting dataset records:', error);
+      throw new Error(`Failed to get dataset records: ${error instanceof Error ? error.message : 'Unknown error'}`);
+    }
+  }
+
+  async getDatasetRecord(id: number): Promise<{ id: number; record: DatasetRecord }> {
+    try {
+      const response = await fetch(`${this.baseUrl}/dataset/records/${id}`);
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      return await response.json();
+    } catch (error) {
+      console.error('Error getting dataset record:', error);
+      throw new Error(`Failed to get dataset record: ${error instanceof Error ? error.message : 'Unknown error'}`);
+    }
+  }
+
   async healthCheck(): Promise<{ message: string; model_loaded: boolean }> {
     try {
       const response = await fetch(`${this.baseUrl}/`);
@@ -114,4 +207,4 @@ export const llmClient = new LLMClient();
 
 // Also export the class for custom instances
 export { LLMClient };
-export type { SummaryRequest, SummaryResponse };
+export type { SummaryRequest, SummaryResponse, DatasetRecord, DatasetPageRequest, DatasetPage, DatasetStats };